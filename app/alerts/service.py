@@ -1,17 +1,48 @@
 from __future__ import annotations
 
-from typing import Dict, Any
-from datetime import datetime, timezone
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
 
 from app.alerts.store import (
-    insert_alert,
-    list_alerts,
+    alert_label_exists,
+    insert_alerts_bulk,
 )
 
 
+# ---------------------------------------------------------
+# TIMESTAMPS
+# ---------------------------------------------------------
+def _now_iso() -> str:
+    """
+    Fixed-width UTC timestamp, e.g. 2024-01-02T03:04:05.123456Z.
+    Built from time_ns() without a tz-aware datetime or .replace().
+    """
+
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+
+    return (
+        f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(sec))}"
+        f".{ns // 1000:06d}Z"
+    )
+
+
 # ---------------------------------------------------------
 # CONFIDENCE ENGINE
 # ---------------------------------------------------------
+SEVERITY_MULTIPLIER = {
+    "NONE": 0.0,
+    "LOW": 0.6,
+    "MEDIUM": 0.8,
+    "HIGH": 1.0,
+    "CRITICAL": 1.2,
+}
+
+# severities outside the table
+DEFAULT_MULTIPLIER = 0.5
+
+
 def compute_confidence(result: Dict[str, Any]) -> float:
 
     score = int(result.get("score", 0))
@@ -19,39 +50,79 @@ def compute_confidence(result: Dict[str, Any]) -> float:
 
     base = min(score / 100.0, 1.0)
 
-    multiplier = {
-        "NONE": 0.0,
-        "LOW": 0.6,
-        "MEDIUM": 0.8,
-        "HIGH": 1.0,
-        "CRITICAL": 1.2,
-    }.get(severity, 0.5)
-
-    confidence = base * multiplier
+    confidence = base * SEVERITY_MULTIPLIER.get(severity, DEFAULT_MULTIPLIER)
 
     return round(min(confidence, 1.0), 3)
 
 
 # ---------------------------------------------------------
 # DEDUPLICATION
+#
+# (session_id, label) pairs already alerted on, most recent
+# last. A bounded positive cache in front of the store: a miss
+# (never seen, or evicted) falls back to one indexed EXISTS.
 # ---------------------------------------------------------
-def is_duplicate(session_id: str, label: str) -> bool:
+DEDUPE_MAX_ENTRIES = 50_000
+
+_dedupe: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+_dedupe_lock = threading.Lock()
 
-    existing = list_alerts(500)
 
-    for a in existing:
+def _remember(key: Tuple[str, str]):
 
-        if a.get("session_id") != session_id:
-            continue
+    _dedupe[key] = None
+    _dedupe.move_to_end(key)
 
-        stored = a.get("labels") or ""
+    if len(_dedupe) > DEDUPE_MAX_ENTRIES:
+        _dedupe.popitem(last=False)
 
-        if label in stored:
-            return True
+
+def _seen(key: Tuple[str, str]) -> bool:
+    """
+    Caller holds _dedupe_lock.
+    """
+
+    if key in _dedupe:
+        _dedupe.move_to_end(key)
+        return True
+
+    if alert_label_exists(*key):
+        _remember(key)
+        return True
 
     return False
 
 
+def is_duplicate(session_id: str, label: str) -> bool:
+
+    with _dedupe_lock:
+        return _seen((session_id, label))
+
+
+def _claim(session_id: str, label: str) -> bool:
+    """
+    Atomically reserve (session_id, label).
+    False if it was already alerted on.
+    """
+
+    key = (session_id, label)
+
+    with _dedupe_lock:
+
+        if _seen(key):
+            return False
+
+        _remember(key)
+
+    return True
+
+
+def _release(session_id: str, label: str):
+
+    with _dedupe_lock:
+        _dedupe.pop((session_id, label), None)
+
+
 # ---------------------------------------------------------
 # ALERT EMIT
 # ---------------------------------------------------------
@@ -69,21 +140,25 @@ def maybe_emit_alert(session_id: str, result: Dict[str, Any]):
 
     confidence = compute_confidence(result)
 
-    ts = datetime.now(timezone.utc)\
-        .isoformat()\
-        .replace("+00:00", "Z")
+    ts = _now_iso()
+
+    score = int(result.get("score", 0))
+    evidence = result.get("evidence", {})
 
-    for label in labels:
+    claimed = [
+        label for label in labels
+        if _claim(session_id, label)
+    ]
 
-        if is_duplicate(session_id, label):
-            continue
+    if not claimed:
+        return
 
-        insert_alert(
-            session_id=session_id,
-            ts=ts,
-            alert_type=label,
-            severity=severity,
-            score=int(result.get("score", 0)),
-            confidence=confidence,
-            evidence=result.get("evidence", {}),
-        )
+    try:
+        insert_alerts_bulk([
+            (session_id, ts, label, severity, score, confidence, evidence)
+            for label in claimed
+        ])
+    except Exception:
+        for label in claimed:
+            _release(session_id, label)
+        raise
@@ -1,7 +1,13 @@
 from pathlib import Path
+import atexit
 import sqlite3
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import orjson
+
+from app.storage.sqlite import SQLitePool
 
 
 DATA_DIR = Path("data")
@@ -10,13 +16,159 @@ DATA_DIR.mkdir(exist_ok=True)
 DB_PATH = DATA_DIR / "llm_ids.db"
 
 
-def get_conn():
+# ---------------------------------------------------------
+# CONNECTIONS
+# ---------------------------------------------------------
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+_POOL = SQLitePool(DB_PATH, _PRAGMAS)
+
+_conn_read = _POOL.reader
+_write_txn = _POOL.write_txn
+close_all = _POOL.close
+
+atexit.register(close_all)
+
+# bumped after every committed alert write so readers can tell cached
+# data is stale; read the version before querying, never after
+_version = 0
+_version_lock = threading.Lock()
+
+
+def alerts_version() -> int:
+    return _version
+
+
+def _bump_version():
+    global _version
+    with _version_lock:
+        _version += 1
+
+
+# ---------------------------------------------------------
+# SQL
+# ---------------------------------------------------------
+_INSERT_ALERT_SQL = """
+    INSERT INTO alerts
+    (session_id,created_at,alert_type,severity,score,confidence,evidence)
+    VALUES (?,?,?,?,?,?,?)
+"""
+
+# Keyset pages, newest first: the cursor is the (created_at, id) of the
+# last row sent, and id breaks created_at ties. The first page has its
+# own statement so a cursor page is a plain index range (created_at<?).
+_LIST_ALERTS_SQL = """
+    SELECT *
+    FROM alerts
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+"""
+
+_LIST_ALERTS_BEFORE_SQL = """
+    SELECT *
+    FROM alerts
+    WHERE (created_at, id) < (?, ?)
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+"""
+
+_SESSION_ALERTS_SQL = """
+    SELECT *
+    FROM alerts
+    WHERE session_id = ?
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+"""
+
+_SESSION_ALERTS_BEFORE_SQL = """
+    SELECT *
+    FROM alerts
+    WHERE session_id = ?
+      AND (created_at, id) < (?, ?)
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+"""
+
+# (created_at, id) of the last row of the previous page
+AlertCursor = Tuple[str, int]
+
+# served from idx_alerts_session_type
+_ALERT_LABEL_EXISTS_SQL = """
+    SELECT 1
+    FROM alerts
+    WHERE session_id = ? AND alert_type = ?
+    LIMIT 1
+"""
+
+_INDEX_SQL = """
+    SELECT sql
+    FROM sqlite_master
+    WHERE type = 'index' AND name = ?
+"""
+
+# LIMIT -1 means no limit in SQLite
+_LIST_ACTIVE_ALERTS_SQL = """
+    SELECT *
+    FROM alerts
+    WHERE created_at >= ?
+      AND score >= ?
+      AND (? IS NULL OR severity = ?)
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+
+# ---------------------------------------------------------
+# EVIDENCE (JSON column)
+# ---------------------------------------------------------
+# non-str keys are stringified, as json.dumps did
+_EVIDENCE_OPTS = orjson.OPT_NON_STR_KEYS
+
+
+def _dump_evidence(evidence: Dict[str, Any]) -> str:
+    return orjson.dumps(evidence, default=str, option=_EVIDENCE_OPTS).decode()
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+
+    d = dict(row)
+
+    raw = d.get("evidence")
+
+    if raw:
+        try:
+            d["evidence"] = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # rows written before evidence was stored as JSON
+            pass
+
+    return d
+
+
+# rows pulled from SQLite per fetchmany() while streaming
+_FETCH_BATCH = 128
+
+
+def _iter_rows(cur: sqlite3.Cursor) -> Iterator[Dict[str, Any]]:
 
-    conn = sqlite3.connect(DB_PATH)
+    cur.arraysize = _FETCH_BATCH
 
-    conn.row_factory = sqlite3.Row
+    while True:
 
-    return conn
+        batch = cur.fetchmany()
+
+        if not batch:
+            return
+
+        for r in batch:
+            yield _row_to_dict(r)
 
 
 # ---------------------------------------------------------
@@ -24,33 +176,65 @@ def get_conn():
 # ---------------------------------------------------------
 def init_db():
 
-    conn = get_conn()
+    with _write_txn() as conn:
 
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS alerts (
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alerts (
 
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
 
-            session_id TEXT,
+                session_id TEXT,
 
-            created_at TEXT,
+                created_at TEXT,
 
-            alert_type TEXT,
+                alert_type TEXT,
 
-            severity TEXT,
+                severity TEXT,
 
-            score INTEGER,
+                score INTEGER,
 
-            confidence REAL,
+                confidence REAL,
 
-            evidence TEXT
+                evidence TEXT
+            )
+            """
         )
-        """
-    )
 
-    conn.commit()
-    conn.close()
+        # per-session pages: read backwards, (session_id, created_at)
+        # yields created_at DESC, id DESC with no sort step. Databases
+        # from before have it on created_at DESC, which leaves ties
+        # to a temp B-tree; rebuild that one once.
+        row = conn.execute(_INDEX_SQL, ("idx_alerts_session",)).fetchone()
+
+        if row is not None and "DESC" in row[0]:
+            conn.execute("DROP INDEX idx_alerts_session")
+
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_alerts_session
+            ON alerts(session_id, created_at)
+            """
+        )
+
+        # active-window range scans
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_alerts_created
+            ON alerts(created_at)
+            """
+        )
+
+        # dedupe identity: one alert per (session, label)
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_alerts_session_type
+            ON alerts(session_id, alert_type)
+            """
+        )
+
+        # refresh planner stats where they are stale
+        conn.execute("PRAGMA optimize")
 
 
 # ---------------------------------------------------------
@@ -66,74 +250,164 @@ def insert_alert(
     evidence: Dict[str, Any],
 ):
 
-    conn = get_conn()
+    with _write_txn() as conn:
+
+        conn.execute(
+            _INSERT_ALERT_SQL,
+            (
+                session_id,
+                ts,
+                alert_type,
+                severity,
+                score,
+                confidence,
+                _dump_evidence(evidence),
+            ),
+        )
 
-    conn.execute(
-        """
-        INSERT INTO alerts
-        (session_id,created_at,alert_type,severity,score,confidence,evidence)
-        VALUES (?,?,?,?,?,?,?)
-        """,
-        (
-            session_id,
-            ts,
-            alert_type,
-            severity,
-            score,
-            confidence,
-            str(evidence),
-        ),
-    )
+    _bump_version()
+
+
+def insert_alerts_bulk(rows: List[Tuple[Any, ...]]):
+    """
+    rows: (session_id, ts, alert_type, severity, score, confidence, evidence)
+    Written in one transaction.
+    """
+
+    if not rows:
+        return
+
+    params = []
+
+    # labels of one result share an evidence dict: encode it once
+    last_evidence: Any = None
+    last_json = ""
 
-    conn.commit()
-    conn.close()
+    for sid, ts, alert_type, severity, score, confidence, evidence in rows:
+
+        if evidence is not last_evidence:
+            last_evidence = evidence
+            last_json = _dump_evidence(evidence)
+
+        params.append(
+            (sid, ts, alert_type, severity, score, confidence, last_json)
+        )
+
+    with _write_txn() as conn:
+
+        conn.executemany(_INSERT_ALERT_SQL, params)
+
+    _bump_version()
 
 
 # ---------------------------------------------------------
 # LIST ALERTS
 # ---------------------------------------------------------
-def list_alerts(limit: int = 100):
+def iter_alerts(
+    limit: int = 100,
+    before: Optional[AlertCursor] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Newest alerts first, decoded lazily in fetchmany() batches.
+    """
+
+    conn = _conn_read()
+
+    if before is None:
+        cur = conn.execute(_LIST_ALERTS_SQL, (limit,))
+    else:
+        cur = conn.execute(_LIST_ALERTS_BEFORE_SQL, (*before, limit))
 
-    conn = get_conn()
+    return _iter_rows(cur)
 
-    rows = conn.execute(
-        """
-        SELECT *
-        FROM alerts
-        ORDER BY created_at DESC
-        LIMIT ?
-        """,
-        (limit,),
-    ).fetchall()
 
-    conn.close()
+def list_alerts(limit: int = 100, before: Optional[AlertCursor] = None):
+    return list(iter_alerts(limit, before))
 
-    return [dict(r) for r in rows]
+
+def iter_session_alerts(
+    session_id: str,
+    limit: int = 100,
+    before: Optional[AlertCursor] = None,
+) -> Iterator[Dict[str, Any]]:
+
+    conn = _conn_read()
+
+    if before is None:
+        cur = conn.execute(_SESSION_ALERTS_SQL, (session_id, limit))
+    else:
+        cur = conn.execute(
+            _SESSION_ALERTS_BEFORE_SQL,
+            (session_id, *before, limit),
+        )
+
+    return _iter_rows(cur)
+
+
+def list_session_alerts(
+    session_id: str,
+    limit: int = 100,
+    before: Optional[AlertCursor] = None,
+):
+    return list(iter_session_alerts(session_id, limit, before))
 
 
 # ---------------------------------------------------------
-# ACTIVE ALERTS
+# DEDUPE LOOKUP
 # ---------------------------------------------------------
-def list_active_alerts(window_seconds: int = 3600):
+def alert_label_exists(session_id: str, label: str) -> bool:
+
+    conn = _conn_read()
+
+    row = conn.execute(
+        _ALERT_LABEL_EXISTS_SQL,
+        (session_id, label),
+    ).fetchone()
+
+    return row is not None
 
-    conn = get_conn()
+
+# ---------------------------------------------------------
+# ACTIVE ALERTS
+# ---------------------------------------------------------
+def iter_active_alerts(
+    window_seconds: int = 3600,
+    min_score: int = 0,
+    severity: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Alerts created in the last window_seconds, newest first.
+    All filters run in SQL; created_at is fixed-width UTC 'Z' text,
+    so the window is a plain range scan on idx_alerts_created.
+    """
+
+    conn = _conn_read()
 
     cutoff = datetime.now(timezone.utc) - timedelta(
         seconds=window_seconds
     )
 
-    rows = conn.execute(
-        """
-        SELECT *
-        FROM alerts
-        WHERE created_at >= ?
-        ORDER BY created_at DESC
-        """,
+    cur = conn.execute(
+        _LIST_ACTIVE_ALERTS_SQL,
         (
-            cutoff.isoformat().replace("+00:00", "Z"),
+            cutoff.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            min_score,
+            severity,
+            severity,
+            -1 if limit is None else limit,
         ),
-    ).fetchall()
+    )
+
+    return _iter_rows(cur)
 
-    conn.close()
 
-    return [dict(r) for r in rows]
+def list_active_alerts(
+    window_seconds: int = 3600,
+    min_score: int = 0,
+    severity: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    return list(
+        iter_active_alerts(window_seconds, min_score, severity, limit)
+    )
@@ -1,29 +1,93 @@
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Set, Tuple
 
 # Simple patterns (good enough for demo; expand later)
 SSN_RE = re.compile(r"\b\d{3}-\d{2}-\d{4}\b")
-CREDIT_CARD_RE = re.compile(r"\b(?:\d[ -]*?){13,19}\b")
-EMAIL_RE = re.compile(r"\b[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}\b", re.IGNORECASE)
+# 13-19 digits, at most one space/dash between digits. Each digit
+# step is atomic, so a miss only backs off whole digits.
+CREDIT_CARD_RE = re.compile(r"\b[0-9](?>[ -]?[0-9]){12,18}\b")
+# The local part only starts at the beginning of a run of local-part
+# characters (not at every word boundary inside it), and it and the
+# domain labels are possessive: neither class contains the character
+# that must follow it ("@" / "."). A long run without "@" is scanned
+# once instead of once per boundary.
+EMAIL_RE = re.compile(
+    r"(?<![A-Z0-9._%+-])[A-Z0-9._%+-]++@(?:[A-Z0-9-]++\.)+[A-Z]{2,}\b",
+    re.IGNORECASE,
+)
+
+# (hit type, pattern) in report order. Each kind gets its
+# own pass: one combined alternation would let an earlier match (a
+# card-shaped digit run) swallow a later kind (an SSN next to it).
+_PII_KINDS = (
+    ("SSN", SSN_RE),
+    ("EMAIL", EMAIL_RE),
+    ("CREDIT_CARD_LIKE", CREDIT_CARD_RE),
+)
+
+# Luhn: value of each digit when it lands on a doubled position
+_LUHN_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+
+def _luhn_ok(number: str) -> bool:
+    total = 0
+    i = 0
+    for ch in reversed(number):
+        if ch == " " or ch == "-":
+            continue
+        d = ord(ch) - 48
+        total += _LUHN_DOUBLED[d] if i & 1 else d
+        i += 1
+    return total % 10 == 0
+
+
+def _has(kind: str, pat: "re.Pattern[str]", text: str) -> bool:
+    # digit runs only count as cards when the checksum holds
+    if kind == "CREDIT_CARD_LIKE":
+        return any(_luhn_ok(m.group()) for m in pat.finditer(text))
+    return pat.search(text) is not None
+
+
+def _found(text: str) -> Set[str]:
+    # every kind is looked for in the original text, independently
+    return {kind for kind, pat in _PII_KINDS if _has(kind, pat, text)}
+
+
+def _hits(found: Set[str]) -> List[Dict[str, str]]:
+    return [{"type": kind} for kind, _ in _PII_KINDS if kind in found]
+
 
 def find_pii(text: str) -> List[Dict[str, str]]:
-    t = text or ""
-    hits: List[Dict[str, str]] = []
-    if SSN_RE.search(t):
-        hits.append({"type": "SSN"})
-    if EMAIL_RE.search(t):
-        hits.append({"type": "EMAIL"})
-    if CREDIT_CARD_RE.search(t):
-        hits.append({"type": "CREDIT_CARD_LIKE"})
-    return hits
+    return _hits(_found(text or ""))
+
 
 def redact_pii(text: str) -> Tuple[str, List[Dict[str, str]]]:
-    t = text or ""
-    hits = find_pii(t)
+    orig = text or ""
+    found: Set[str] = set()
+
+    def _redact_card(m: "re.Match[str]") -> str:
+        if not _luhn_ok(m.group()):
+            return m.group()
+        found.add("CREDIT_CARD_LIKE")
+        return "[REDACTED_NUMBER]"
+
+    # SSNs and emails go first, so a digit run that only failed Luhn
+    # because it ran into an SSN is checked again without it.
+    t, n = SSN_RE.subn("[REDACTED_SSN]", orig)
+    if n:
+        found.add("SSN")
+
+    # Looked for in the original, as an SSN sub can cut an email
+    # apart. It can't create one ("[", "]" and "_" never occur in a
+    # match), so no email in the original means nothing to replace.
+    has_email = EMAIL_RE.search(orig) is not None
+    if has_email:
+        found.add("EMAIL")
+        t = EMAIL_RE.sub("[REDACTED_EMAIL]", t)
 
-    t = SSN_RE.sub("[REDACTED_SSN]", t)
-    t = EMAIL_RE.sub("[REDACTED_EMAIL]", t)
-    # credit card “like” can false-positive; still fine for demo
-    t = CREDIT_CARD_RE.sub("[REDACTED_NUMBER]", t)
+    # Untouched text: the card sub below sees what detection would.
+    if (n or has_email) and _has("CREDIT_CARD_LIKE", CREDIT_CARD_RE, orig):
+        found.add("CREDIT_CARD_LIKE")
+    t = CREDIT_CARD_RE.sub(_redact_card, t)
 
-    return t, hits
+    return t, _hits(found)
@@ -1,9 +1,31 @@
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 import yaml
 
 POLICY_PATH = os.getenv("IDS_POLICY_PATH", "app/policy.yaml")
 
+# libyaml's C loader when PyYAML was built with it
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# (path, mtime_ns, parsed policy)
+_POLICY_CACHE: Optional[Tuple[str, int, Dict[str, Any]]] = None
+
+
 def load_policy() -> Dict[str, Any]:
+    """
+    Parsed policy, re-read only when the file changes.
+    The returned dict is shared between callers; treat it as read-only.
+    """
+    global _POLICY_CACHE
+
+    mtime = os.stat(POLICY_PATH).st_mtime_ns
+
+    cached = _POLICY_CACHE
+    if cached is not None and cached[0] == POLICY_PATH and cached[1] == mtime:
+        return cached[2]
+
     with open(POLICY_PATH, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+        policy = yaml.load(f, Loader=_Loader) or {}
+
+    _POLICY_CACHE = (POLICY_PATH, mtime, policy)
+    return policy
@@ -1,9 +1,12 @@
 # For normal LLM calls (non‑streaming)
 import os
+import threading
 from typing import Any, Dict, Optional
 
 import requests
 
+from app.llm.http import SESSION
+
 
 PRIMARY_PROVIDER = os.getenv("PRIMARY_LLM_PROVIDER", "ollama")  # only ollama for now
 SAFE_PROVIDER = os.getenv("SAFE_LLM_PROVIDER", "ollama")
@@ -19,12 +22,17 @@ def _pick_provider(decision: str) -> str:
     return PRIMARY_PROVIDER if decision == "allow" else SAFE_PROVIDER
 
 
-def _ollama_generate(prompt: str, system: Optional[str] = None) -> str:
-    """
-    Try /api/generate first.
-    If the server responds 404 for /api/generate, fallback to /api/chat.
-    """
-    # 1) /api/generate (prompt-based)
+_GENERATE_PATH = "/api/generate"
+_CHAT_PATH = "/api/chat"
+
+# Endpoint this Ollama server answers on, learned from the first call.
+# None until probed; guarded by _ENDPOINT_LOCK while probing.
+_OLLAMA_ENDPOINT: Optional[str] = None
+_ENDPOINT_LOCK = threading.Lock()
+
+
+def _post_generate(prompt: str, system: Optional[str]) -> requests.Response:
+    # /api/generate (prompt-based)
     payload_generate: Dict[str, Any] = {
         "model": OLLAMA_MODEL,
         "prompt": prompt,
@@ -33,24 +41,21 @@ def _ollama_generate(prompt: str, system: Optional[str] = None) -> str:
     if system:
         payload_generate["system"] = system
 
-    try:
-        r = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            json=payload_generate,
-            timeout=EXECUTOR_TIMEOUT_S,
-        )
-        if r.status_code == 404:
-            raise requests.HTTPError("generate_not_found", response=r)
-        r.raise_for_status()
-        data = r.json()
-        return data.get("response", "") or ""
-    except requests.HTTPError as ex:
-        # Only fallback on "endpoint not found"
-        resp = getattr(ex, "response", None)
-        if resp is None or resp.status_code != 404:
-            raise
-
-    # 2) /api/chat (messages-based)
+    return SESSION.post(
+        f"{OLLAMA_BASE_URL}{_GENERATE_PATH}",
+        json=payload_generate,
+        timeout=EXECUTOR_TIMEOUT_S,
+    )
+
+
+def _read_generate(r: requests.Response) -> str:
+    r.raise_for_status()
+    data = r.json()
+    return data.get("response", "") or ""
+
+
+def _chat(prompt: str, system: Optional[str]) -> str:
+    # /api/chat (messages-based)
     messages = []
     if system:
         messages.append({"role": "system", "content": system})
@@ -62,8 +67,8 @@ def _ollama_generate(prompt: str, system: Optional[str] = None) -> str:
         "stream": False,
     }
 
-    r2 = requests.post(
-        f"{OLLAMA_BASE_URL}/api/chat",
+    r2 = SESSION.post(
+        f"{OLLAMA_BASE_URL}{_CHAT_PATH}",
         json=payload_chat,
         timeout=EXECUTOR_TIMEOUT_S,
     )
@@ -75,6 +80,35 @@ def _ollama_generate(prompt: str, system: Optional[str] = None) -> str:
     return (msg.get("content") or "").strip()
 
 
+def _ollama_generate(prompt: str, system: Optional[str] = None) -> str:
+    """
+    Use /api/generate, or /api/chat on servers where /api/generate 404s.
+    The first call probes and remembers the answer, so later calls go
+    straight to the right endpoint.
+    """
+    global _OLLAMA_ENDPOINT
+
+    if _OLLAMA_ENDPOINT == _GENERATE_PATH:
+        return _read_generate(_post_generate(prompt, system))
+
+    if _OLLAMA_ENDPOINT == _CHAT_PATH:
+        return _chat(prompt, system)
+
+    with _ENDPOINT_LOCK:
+        if _OLLAMA_ENDPOINT is None:
+            r = _post_generate(prompt, system)
+
+            # Only fallback on "endpoint not found"
+            if r.status_code == 404:
+                _OLLAMA_ENDPOINT = _CHAT_PATH
+            else:
+                text = _read_generate(r)
+                _OLLAMA_ENDPOINT = _GENERATE_PATH
+                return text
+
+    return _ollama_generate(prompt, system)
+
+
 def call_downstream_llm(
     decision: str,
     prompt: str,
@@ -0,0 +1,24 @@
+# Shared HTTP session for downstream LLM calls
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = int(os.getenv("LLM_HTTP_POOL_CONNECTIONS", "8"))
+POOL_MAXSIZE = int(os.getenv("LLM_HTTP_POOL_MAXSIZE", "32"))
+
+
+def _make_session() -> requests.Session:
+    s = requests.Session()
+    # keep-alive pool per host; retries stay with the caller
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=0,
+    )
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+SESSION = _make_session()
@@ -1,9 +1,10 @@
 # For streaming token output
 import os
-import json
 from typing import Any, Dict, Iterator, Optional
 
-import requests
+import orjson
+
+from app.llm.http import SESSION
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://host.docker.internal:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b-instruct-q5_K_M")
@@ -21,7 +22,7 @@ def ollama_generate_stream(prompt: str, system: Optional[str] = None) -> Iterato
     if system:
         payload["system"] = system
 
-    with requests.post(
+    with SESSION.post(
         f"{OLLAMA_BASE_URL}/api/generate",
         json=payload,
         stream=True,
@@ -29,11 +30,12 @@ def ollama_generate_stream(prompt: str, system: Optional[str] = None) -> Iterato
     ) as r:
         r.raise_for_status()
 
-        for raw in r.iter_lines(decode_unicode=True):
+        # raw bytes straight into orjson; no per-line str decode
+        for raw in r.iter_lines():
             if not raw:
                 continue
 
-            data = json.loads(raw)
+            data = orjson.loads(raw)
             chunk = data.get("response", "")
             if chunk:
                 yield chunk
@@ -1,54 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
-
-from fastapi import FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from html import escape as esc
+from operator import itemgetter
+from typing import Optional, Tuple
+
+import orjson
+from pydantic import ValidationError
+from fastapi import FastAPI, Form, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import (
+    HTMLResponse,
+    ORJSONResponse,
+    RedirectResponse,
+    Response,
+)
+from starlette.concurrency import run_in_threadpool
 
 from app.schemas import Event
 from app.scoring.timeline import build_timeline
 from app.scoring.engine import score_session, config_snapshot
 from app.storage.db import (
-    get_conn,
+    insert_event,
+    insert_events,
     init_db as init_events_db,
+    close_all as close_events_db,
     list_sessions,
     get_session_events,
-    list_alerts,
-    get_alerts_for_session,
-    dev_reset_all,
+    next_turn_id,
+    session_version,
 )
 from app.alerts.service import maybe_emit_alert
-from app.ui.layout import page_html
+from app.scoring.scheduler import ScoringScheduler
+from app.storage.batcher import IngestBatcher
+from app.ui.layout import StaticPage, page_html, stream_page
 from app.ui.dashboard import router as dashboard_router
 from app.ui.alerts import router as alerts_router
 from app.ui.active import router as active_router  # ✅ FIXED
-from app.alerts.store import init_db as init_alerts_db
+from app.ui.dev import router as dev_router
+from app.alerts.store import (
+    init_db as init_alerts_db,
+    close_all as close_alerts_db,
+    list_alerts,
+    list_session_alerts,
+    AlertCursor,
+)
 
 # ---------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------
 
-def utc_now_iso():
-    return (
-        datetime.now(timezone.utc)
-        .replace(microsecond=0)
-        .isoformat()
-    )
+# (whole second, formatted) of the last call: bursts of events
+# within one second reuse the string
+_now_cache = (0, "")
+
+
+def utc_now_iso(now: Optional[float] = None):
+    global _now_cache
+
+    sec = int(time.time() if now is None else now)
+
+    cached = _now_cache
+    if cached[0] == sec:
+        return cached[1]
+
+    # same text as datetime.isoformat() at second precision
+    ts = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(sec))
+
+    _now_cache = (sec, ts)
+    return ts
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app: FastAPI):
 
     init_events_db()
 
     init_alerts_db()   # ⭐ REQUIRED
 
+    # keyword tiers are fixed for the process: encode them once
+    app.state.config_json = orjson.dumps(config_snapshot())
+
+    # concurrent /v1/events inserts share one transaction
+    app.state.ingest_batcher = IngestBatcher(insert_events)
+    app.state.ingest_batcher.start()
+
+    # bursts of events per session are scored once
+    app.state.scoring = ScoringScheduler(_rescore)
+
     yield
 
+    await app.state.ingest_batcher.stop()
+    await app.state.scoring.stop()
+
+    # after the last flush: nothing writes past this point
+    close_events_db()
+    close_alerts_db()
+
 
 app = FastAPI(
     title="LLM‑IDS",
     version="0.6.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # ---------------------------------------------------------
@@ -58,6 +113,7 @@ app = FastAPI(
 app.include_router(dashboard_router)
 app.include_router(alerts_router)
 app.include_router(active_router)   # ✅ FIXED
+app.include_router(dev_router)
 
 
 # ---------------------------------------------------------
@@ -70,68 +126,124 @@ def health():
 
 
 # ---------------------------------------------------------
-# DEV RESET (Toast Enabled)
+# Events ingest (API)
 # ---------------------------------------------------------
 
-@app.post("/ui/dev/reset")
-def ui_dev_reset():
-    dev_reset_all()
-    return RedirectResponse(
-        "/ui/dashboard?msg=System+Reset+Complete",
-        status_code=303,
-    )
+# SQLite and scoring block, so each handler hands its whole blocking
+# part to the threadpool in one hop and the event loop stays free.
 
+# The body is validated straight from its raw bytes by pydantic-core's
+# JSON parser, skipping the json.loads() + dict pass FastAPI does for
+# a model parameter. The schema is still published for the docs.
+_EVENT_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": Event.model_json_schema()}},
+    }
+}
 
-# ---------------------------------------------------------
-# Events ingest (API)
-# ---------------------------------------------------------
 
-@app.post("/v1/events")
-def ingest_event(evt: Event):
+def _parse_event(raw: bytes) -> Event:
 
-    ts = evt.ts or utc_now_iso()
+    try:
+        return Event.model_validate_json(raw)
+    except ValidationError as ex:
+        # same 422 shape FastAPI gives a body model
+        raise RequestValidationError(
+            [
+                {**err, "loc": ("body", *err["loc"])}
+                for err in ex.errors(include_url=False)
+            ]
+        ) from None
 
-    conn = get_conn()
-    conn.execute(
-        """
-        INSERT INTO events
-        (session_id, turn_id, role, content, ts, model)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
+
+@app.post("/v1/events", openapi_extra=_EVENT_BODY)
+async def ingest_event(request: Request):
+
+    evt = _parse_event(await request.body())
+
+    await app.state.ingest_batcher.submit(
         (
             evt.session_id,
             evt.turn_id,
             evt.role,
             evt.content,
-            ts,
+            evt.ts or utc_now_iso(),
             evt.model,
-        ),
+        )
     )
-    conn.commit()
-    conn.close()
 
-    events = get_session_events(evt.session_id)
-    result = score_session(events)
+    # stored; scoring and alerting follow within the delay window.
+    # Blank messages are rescored too: a level-0 turn landing between
+    # two others can add an escalation step.
+    app.state.scoring.schedule(evt.session_id)
+
+    return {"received": True, "queued": True}
+
+
+def _rescore(session_id: str):
 
-    maybe_emit_alert(evt.session_id, result)
+    result = score_session(get_session_events(session_id))
 
-    return {"received": True}
+    maybe_emit_alert(session_id, result)
 
 
 # ---------------------------------------------------------
 # Alerts API
 # ---------------------------------------------------------
 
+# page size bounds; a negative LIMIT would mean "all rows" to SQLite
+_PAGE_LIMIT = Query(100, ge=1, le=1000)
+
+
+# Cursors are "<created_at>|<id>" of the last row sent; id breaks
+# created_at ties. created_at may hold anything, so split on the last "|".
+def _next_cursor(rows, limit: int) -> Optional[str]:
+    # a short page is the last one
+    if len(rows) < limit:
+        return None
+
+    last = rows[-1]
+
+    return f"{last['created_at']}|{last['id']}"
+
+
+def _parse_cursor(before: Optional[str]) -> Optional[AlertCursor]:
+
+    if before is None:
+        return None
+
+    created_at, sep, alert_id = before.rpartition("|")
+
+    if not sep or not alert_id.isdigit():
+        raise HTTPException(status_code=422, detail="invalid cursor")
+
+    return created_at, int(alert_id)
+
+
 @app.get("/v1/alerts")
-def alerts(limit: int = 100):
-    return {"alerts": list_alerts(limit=limit)}
+async def alerts(limit: int = _PAGE_LIMIT, before: Optional[str] = None):
+
+    rows = await run_in_threadpool(list_alerts, limit, _parse_cursor(before))
+
+    return {"alerts": rows, "next_cursor": _next_cursor(rows, limit)}
 
 
 @app.get("/v1/alerts/{session_id}")
-def alerts_session(session_id: str):
+async def alerts_session(
+    session_id: str,
+    limit: int = _PAGE_LIMIT,
+    before: Optional[str] = None,
+):
+
+    rows = await run_in_threadpool(
+        list_session_alerts, session_id, limit, _parse_cursor(before)
+    )
+
     return {
         "session_id": session_id,
-        "alerts": get_alerts_for_session(session_id),
+        "alerts": rows,
+        "next_cursor": _next_cursor(rows, limit),
     }
 
 
@@ -141,33 +253,37 @@ def alerts_session(session_id: str):
 
 @app.get("/v1/config")
 def config():
-    return config_snapshot()
+    return Response(app.state.config_json, media_type="application/json")
 
 
 # ---------------------------------------------------------
 # UI HOME
 # ---------------------------------------------------------
 
-@app.get("/", response_class=HTMLResponse)
-def ui_home(request: Request):
+_HOME_BODY = """
+<h2>LLM IDS</h2>
+<div class="card">
+    <form method="post" action="/ui/send">
+        <label>Session ID</label>
+        <input name="session_id" style="width:100%;padding:10px;margin-top:6px;">
 
-    body = """
-    <h2>LLM IDS</h2>
-    <div class="card">
-        <form method="post" action="/ui/send">
-            <label>Session ID</label>
-            <input name="session_id" style="width:100%;padding:10px;margin-top:6px;">
+        <label>Message</label>
+        <textarea name="content" rows="6"
+            style="width:100%;padding:10px;margin-top:6px;"></textarea>
 
-            <label>Message</label>
-            <textarea name="content" rows="6"
-                style="width:100%;padding:10px;margin-top:6px;"></textarea>
+        <button type="submit" style="margin-top:12px;">Send</button>
+    </form>
+</div>
+"""
 
-            <button type="submit" style="margin-top:12px;">Send</button>
-        </form>
-    </div>
-    """
+# nothing on the home page varies per request
+_HOME_PAGE = StaticPage("Home", _HOME_BODY, active="home")
 
-    return page_html("Home", body, active="home")
+
+# async: serving constant bytes needs no threadpool hop
+@app.get("/", response_class=HTMLResponse)
+async def ui_home(request: Request):
+    return _HOME_PAGE.response(request)
 
 
 # ---------------------------------------------------------
@@ -175,75 +291,56 @@ def ui_home(request: Request):
 # ---------------------------------------------------------
 
 @app.post("/ui/send")
-def ui_send(
+async def ui_send(
     session_id: str = Form(default=""),
     content: str = Form(default=""),
 ):
 
+    # nothing to store or score
+    if not content.strip():
+        return RedirectResponse("/ui/sessions", status_code=303)
+
+    # one clock read for both the fallback id and the event ts
+    now = time.time()
+
     sid = session_id.strip()
 
     if not sid:
-        sid = f"ui_{int(datetime.now(timezone.utc).timestamp())}"
+        sid = f"ui_{int(now)}"
 
-    events = get_session_events(sid)
-    turn = 1
+    await run_in_threadpool(_ui_send, sid, content, now)
 
-    if events:
-        turn = max(int(e["turn_id"]) for e in events) + 1
+    return RedirectResponse("/ui/sessions", status_code=303)
 
-    conn = get_conn()
-    conn.execute(
-        """
-        INSERT INTO events
-        (session_id, turn_id, role, content, ts, model)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            sid,
-            turn,
-            "user",
-            content,
-            utc_now_iso(),
-            None,
-        ),
+
+def _ui_send(sid: str, content: str, now: float):
+
+    turn = next_turn_id(sid)
+
+    events = insert_event(
+        sid,
+        turn,
+        "user",
+        content,
+        utc_now_iso(now),
+        None,
     )
-    conn.commit()
-    conn.close()
 
-    result = score_session(get_session_events(sid))
+    result = score_session(events)
     maybe_emit_alert(sid, result)
 
-    return RedirectResponse("/ui/sessions", status_code=303)
-
 
 # ---------------------------------------------------------
 # Sessions UI
 # ---------------------------------------------------------
 
-@app.get("/ui/sessions", response_class=HTMLResponse)
-def ui_sessions(request: Request, limit: int = 100):
-
-    items = list_sessions(limit=limit)
-
-    rows = []
-
-    for s in items:
-        sid = s.get("session_id", "")
-        cnt = s.get("event_count", 0)
-
-        rows.append(f"""
-        <tr>
-            <td><code>{sid}</code></td>
-            <td>{cnt}</td>
-            <td>
-                <a href="/ui/timeline/{sid}">Timeline</a>
-            </td>
-        </tr>
-        """)
-
-    body = f"""
+_SESSIONS_PAGE = """
     <h2>Sessions</h2>
     <div class="card">
+        <form method="get" action="/ui/sessions">
+            <input name="q" value="{q}" placeholder="Search session id">
+            <button type="submit">Search</button>
+        </form>
         <table>
             <thead>
                 <tr>
@@ -253,43 +350,126 @@ def ui_sessions(request: Request, limit: int = 100):
                 </tr>
             </thead>
             <tbody>
-                {''.join(rows) if rows else '<tr><td colspan="3">No Sessions</td></tr>'}
+                {rows}
             </tbody>
         </table>
     </div>
     """
 
-    return page_html("Sessions", body, active="sessions", request=request)
+_SESSION_ROW = """
+        <tr>
+            <td><code>%s</code></td>
+            <td>%s</td>
+            <td>
+                <a href="/ui/timeline/%s">Timeline</a>
+            </td>
+        </tr>
+        """
+
+_session_fields = itemgetter("session_id", "event_count")
+
+_NO_SESSION_ROWS = '<tr><td colspan="3">No Sessions</td></tr>'
+
+_SESSIONS_HEAD, _SESSIONS_TAIL = _SESSIONS_PAGE.split("{rows}")
+
+
+@app.get("/ui/sessions", response_class=HTMLResponse)
+async def ui_sessions(request: Request, limit: int = 100, q: str = ""):
+
+    q = q.strip()
+
+    items = await run_in_threadpool(list_sessions, limit, q or None)
+
+    rows = []
+
+    for sid, cnt in map(_session_fields, items):
+        sid = esc(sid)
+        rows.append(_SESSION_ROW % (sid, cnt, sid))
+
+    return stream_page(
+        "Sessions",
+        _SESSIONS_HEAD.format(q=esc(q)),
+        rows,
+        _SESSIONS_TAIL,
+        empty=_NO_SESSION_ROWS,
+        active="sessions",
+    )
 
 
 # ---------------------------------------------------------
 # Timeline UI
 # ---------------------------------------------------------
 
+_TIMELINE_PAGE = """
+    <h2>Timeline — {session_id}</h2>
+
+    <div class="card">
+        <b>Severity:</b> {severity}<br>
+        <b>Score:</b> {score}<br>
+        <b>Confidence:</b> {confidence}
+    </div>
+    """
+
+
+# Rendered pages keyed by (session id, session_version()), so a
+# repeat view of an unchanged session skips scoring and rendering.
+TIMELINE_CACHE_MAX = 256
+
+_timeline_cache: "OrderedDict[Tuple[str, Tuple[int, int]], str]" = OrderedDict()
+_timeline_lock = threading.Lock()
+
+
 @app.get("/ui/timeline/{session_id}", response_class=HTMLResponse)
-def ui_timeline(session_id: str, request: Request):
+async def ui_timeline(session_id: str, request: Request):
 
-    events = get_session_events(session_id)
+    html = await run_in_threadpool(_timeline_html, session_id)
 
-    if not events:
+    if html is None:
         raise HTTPException(status_code=404, detail="session not found")
 
-    tl = build_timeline(events, include_events=True)
+    return HTMLResponse(html)
+
+
+def _timeline_html(session_id: str) -> Optional[str]:
+
+    version = session_version(session_id)
+
+    if version is None:
+        return None
+
+    key = (session_id, version)
+
+    with _timeline_lock:
+        html = _timeline_cache.get(key)
+        if html is not None:
+            _timeline_cache.move_to_end(key)
+            return html
+
+    tl = build_timeline(
+        get_session_events(session_id),
+        include_events=True,
+    )
+
     final = tl.get("final", {})
 
-    body = f"""
-    <h2>Timeline — {session_id}</h2>
+    sid = esc(session_id)
 
-    <div class="card">
-        <b>Severity:</b> {final.get("severity")}<br>
-        <b>Score:</b> {final.get("score")}<br>
-        <b>Confidence:</b> {final.get("confidence")}
-    </div>
-    """
+    body = _TIMELINE_PAGE.format(
+        session_id=sid,
+        severity=final.get("severity"),
+        score=final.get("score"),
+        confidence=final.get("confidence"),
+    )
 
-    return page_html(
-        f"Timeline {session_id}",
+    html = page_html(
+        f"Timeline {sid}",
         body,
         active="sessions",
-        request=request,
     )
+
+    with _timeline_lock:
+        _timeline_cache[key] = html
+        if len(_timeline_cache) > TIMELINE_CACHE_MAX:
+            _timeline_cache.popitem(last=False)
+
+    return html
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import os
 import re
+import threading
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Set
 
 
@@ -39,7 +42,43 @@ DANGEROUS_PATTERNS = [
     r"\b3d\s*print\s+(a\s*)?gun\b",
 ]
 
-_COMPILED = [re.compile(p, re.IGNORECASE) for p in DANGEROUS_PATTERNS]
+# One alternation: each text is scanned once for every pattern.
+_DANGEROUS_RE = re.compile(
+    "|".join(f"(?:{p})" for p in DANGEROUS_PATTERNS),
+    re.IGNORECASE,
+)
+
+
+# Verdicts keyed by a digest of the text, not the text: a session's
+# whole transcript is checked on every routing call, and hashing it
+# is ~25x cheaper than scanning it, while the cache stays small.
+HARD_SAFETY_CACHE_MAX = 4096
+
+_hard_cache: "OrderedDict[bytes, bool]" = OrderedDict()
+_hard_lock = threading.Lock()
+
+
+def _is_dangerous(text: str) -> bool:
+
+    if not text:
+        return False
+
+    key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    with _hard_lock:
+        hit = _hard_cache.get(key)
+        if hit is not None:
+            _hard_cache.move_to_end(key)
+            return hit
+
+    hit = _DANGEROUS_RE.search(text) is not None
+
+    with _hard_lock:
+        _hard_cache[key] = hit
+        if len(_hard_cache) > HARD_SAFETY_CACHE_MAX:
+            _hard_cache.popitem(last=False)
+
+    return hit
 
 
 def _normalize(text: str) -> str:
@@ -51,9 +90,8 @@ def detect_hard_safety_violation(score_result: Dict[str, Any]) -> Optional[str]:
     last_user = _normalize(feats.get("last_user_content", ""))
     all_user = _normalize(feats.get("all_user_content", ""))
 
-    for pat in _COMPILED:
-        if pat.search(last_user) or pat.search(all_user):
-            return "DANGEROUS_REQUEST"
+    if _is_dangerous(last_user) or _is_dangerous(all_user):
+        return "DANGEROUS_REQUEST"
 
     return None
 
@@ -62,8 +100,10 @@ def route_decision(session_id: str, score_result: Dict[str, Any]) -> Dict[str, A
     score = int(score_result.get("score", 0))
     severity = str(score_result.get("severity", "NONE"))
 
-    labels: List[str] = list(score_result.get("labels", []) or [])
-    reasons: List[str] = list(score_result.get("reasons", []) or [])
+    # read-only views of the score result; only the label list that
+    # ends up in the returned dict is copied
+    labels: List[str] = score_result.get("labels") or []
+    reasons: List[str] = score_result.get("reasons") or []
     labels_set = set(labels)
 
     # -------------------------------------------------
@@ -101,7 +141,7 @@ def route_decision(session_id: str, score_result: Dict[str, Any]) -> Dict[str, A
         "decision": decision,
         "score": score,
         "severity": severity,
-        "labels": labels,
+        "labels": list(labels),
         "top_reason": (reasons[0] if reasons else ""),
         "timeline_url": f"/v1/timeline/{session_id}",
         "alerts_url": f"/v1/alerts/{session_id}",
@@ -1,4 +1,6 @@
-from typing import List, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 
 
 # ---------------------------------------------------------
@@ -87,7 +89,7 @@ def config_snapshot() -> Dict[str, Any]:
 # BEHAVIORAL ESCALATION ENGINE
 # ---------------------------------------------------------
 
-def score_session(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _score_events(events: List[Dict[str, Any]]) -> Dict[str, Any]:
 
     user_messages = [
         e["content"]
@@ -156,3 +158,61 @@ def score_session(events: List[Dict[str, Any]]) -> Dict[str, Any]:
         "labels": labels,
         "evidence": evidence,
     }
+
+
+# ---------------------------------------------------------
+# SCORE CACHE
+# ---------------------------------------------------------
+
+# Stored events are append-only and AUTOINCREMENT never reuses the
+# id of a committed row (not even after a reset), so (session, count,
+# max id) identifies a session's exact event set. Rolled-back ids are
+# handed out again, which is why the event cache only takes rows after
+# COMMIT. Ingest misses by construction; timeline views of an
+# unchanged session hit.
+SCORE_CACHE_MAX = 4096
+
+_score_cache: "OrderedDict[Tuple[Any, int, int], Dict[str, Any]]" = OrderedDict()
+_score_lock = threading.Lock()
+
+
+def _score_key(events: List[Dict[str, Any]]) -> Optional[Tuple[Any, int, int]]:
+
+    max_id = 0
+
+    for e in events:
+        i = e.get("id")
+        if i is None:
+            # not read back from storage: nothing stable to key on
+            return None
+        if i > max_id:
+            max_id = i
+
+    return (events[0].get("session_id"), len(events), max_id)
+
+
+def score_session(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Cached for stored events. The result may be shared between
+    callers; treat it as read-only.
+    """
+
+    key = _score_key(events) if events else None
+
+    if key is None:
+        return _score_events(events)
+
+    with _score_lock:
+        result = _score_cache.get(key)
+        if result is not None:
+            _score_cache.move_to_end(key)
+            return result
+
+    result = _score_events(events)
+
+    with _score_lock:
+        _score_cache[key] = result
+        if len(_score_cache) > SCORE_CACHE_MAX:
+            _score_cache.popitem(last=False)
+
+    return result
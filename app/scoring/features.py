@@ -31,6 +31,9 @@ REFUSAL_PATTERNS = [
     r"\bcan'?t do that\b",
 ]
 
+# compiled once; any pattern matching == the alternation matching
+REFUSAL_RE = re.compile("|".join(REFUSAL_PATTERNS))
+
 DEFAULT_SENSITIVE_KEYWORDS = [
     "system prompt",
     "hidden prompt",
@@ -57,8 +60,11 @@ REPHRASE_WINDOW_TURNS = int(os.getenv("REFUSAL_WINDOW_TURNS", "2"))
 # -----------------------------
 # Text helpers
 # -----------------------------
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
 def _tokens(text: str) -> List[str]:
-    return re.findall(r"[a-z0-9']+", normalize_text(text))
+    return _TOKEN_RE.findall(normalize_text(text))
 
 
 def jaccard(a: str, b: str) -> float:
@@ -76,7 +82,7 @@ def keyword_count(text: str) -> int:
 
 def is_refusal(text: str) -> bool:
     t = normalize_text(text)
-    return any(re.search(p, t) for p in REFUSAL_PATTERNS)
+    return REFUSAL_RE.search(t) is not None
 
 
 # -----------------------------
@@ -12,13 +12,16 @@ REFUSAL_PATTERNS = [
     r"\bcan'?t do that\b",
 ]
 
+REFUSAL_RE = re.compile("|".join(REFUSAL_PATTERNS))
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
 def is_refusal(text: str) -> bool:
     t = (text or "").lower()
-    return any(re.search(p, t) for p in REFUSAL_PATTERNS)
+    return REFUSAL_RE.search(t) is not None
 
 def token_jaccard(a: str, b: str) -> float:
-    wa = set(re.findall(r"[a-z0-9']+", (a or "").lower()))
-    wb = set(re.findall(r"[a-z0-9']+", (b or "").lower()))
+    wa = set(_TOKEN_RE.findall((a or "").lower()))
+    wb = set(_TOKEN_RE.findall((b or "").lower()))
     if not wa or not wb:
         return 0.0
     return len(wa & wb) / len(wa | wb)
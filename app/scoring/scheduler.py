@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from functools import partial
+from typing import Callable, Dict, Set
+
+from starlette.concurrency import run_in_threadpool
+
+
+# How long new events of a session are gathered before it is rescored.
+SCORE_DELAY_SECONDS = float(os.getenv("IDS_SCORE_DELAY_MS", "100")) / 1000.0
+
+log = logging.getLogger(__name__)
+
+
+class ScoringScheduler:
+    """
+    Rescores a session at most once per delay window instead of once
+    per event. The first event of a burst arms a timer; later events in
+    the window ride along. The timer is not pushed back, so a steady
+    stream is still scored every window.
+
+    run(session_id) is blocking and goes to the threadpool.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str], None],
+        delay: float = SCORE_DELAY_SECONDS,
+    ):
+
+        self._run = run
+        self.delay = delay
+
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._running: Set[asyncio.Task] = set()
+
+    def schedule(self, session_id: str):
+
+        if session_id in self._timers:
+            return
+
+        loop = asyncio.get_running_loop()
+
+        self._timers[session_id] = loop.call_later(
+            self.delay,
+            self._fire,
+            session_id,
+        )
+
+    def _fire(self, session_id: str):
+
+        self._timers.pop(session_id, None)
+
+        task = asyncio.create_task(run_in_threadpool(self._run, session_id))
+
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        task.add_done_callback(partial(self._report, session_id))
+
+    @staticmethod
+    def _report(session_id: str, task: asyncio.Task):
+        """
+        Nobody awaits a scoring run: log its failure here, or the
+        lost score (and any alert it would have raised) goes unseen.
+        """
+
+        if task.cancelled():
+            return
+
+        ex = task.exception()
+
+        if ex is not None:
+            log.error("scoring session %r failed", session_id, exc_info=ex)
+
+    async def stop(self):
+        """
+        Score everything still pending now, then wait for all runs.
+        """
+
+        for session_id, timer in list(self._timers.items()):
+            timer.cancel()
+            self._fire(session_id)
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
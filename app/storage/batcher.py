@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+
+# Largest batch handed to flush() in one call.
+MAX_BATCH = 256
+
+
+class IngestBatcher:
+    """
+    Groups concurrent submissions into one flush() call, so a burst of
+    writes shares one transaction (one commit) instead of one each.
+
+    There is no wait timer: a lone submission is flushed at once, and
+    whatever arrives while a flush runs in the threadpool forms the
+    next batch. A single consumer keeps submission order, so events of
+    a session are stored in the order they were submitted.
+
+    flush(rows) is blocking. submit() returns once its row's batch
+    has been flushed.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], None],
+        max_batch: int = MAX_BATCH,
+    ):
+
+        self._flush = flush
+        self.max_batch = max_batch
+
+        self._queue: "asyncio.Queue[Optional[Tuple[Any, asyncio.Future]]]" = (
+            asyncio.Queue()
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Flush what is queued, then stop.
+        """
+
+        if self._task is None:
+            return
+
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, row: Any):
+
+        fut = asyncio.get_running_loop().create_future()
+
+        await self._queue.put((row, fut))
+
+        return await fut
+
+    async def _run(self):
+
+        while True:
+
+            item = await self._queue.get()
+
+            if item is None:
+                return
+
+            batch = [item]
+            stopping = False
+
+            while len(batch) < self.max_batch and not self._queue.empty():
+
+                item = self._queue.get_nowait()
+
+                if item is None:
+                    stopping = True
+                    break
+
+                batch.append(item)
+
+            await self._write(batch)
+
+            if stopping:
+                return
+
+    async def _write(self, batch: List[Tuple[Any, asyncio.Future]]):
+
+        try:
+            await run_in_threadpool(
+                self._flush,
+                [row for row, _ in batch],
+            )
+        except Exception as ex:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(ex)
+            return
+
+        for _, fut in batch:
+            # the submitter may have gone away (request cancelled)
+            if not fut.done():
+                fut.set_result(None)
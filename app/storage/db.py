@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-import sqlite3
+import atexit
+import threading
+from bisect import insort
+from collections import OrderedDict
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.storage.sqlite import SQLitePool
 
 DB_PATH = Path("llm_ids.db")
 
@@ -12,10 +18,32 @@ DB_PATH = Path("llm_ids.db")
 # CONNECTION
 # ---------------------------------------------------------
 
+# Opened once and reused: WAL so timeline/dashboard reads don't
+# block ingest, NORMAL sync (fsync at checkpoint, not per commit),
+# a 64 MB page cache and a 256 MB memory map for read-heavy pages.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+_POOL = SQLitePool(DB_PATH, _PRAGMAS)
+
+write_txn = _POOL.write_txn
+close_all = _POOL.close
+
+atexit.register(close_all)
+
+
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """
+    Shared per-thread read connection; do not close it.
+    Writes go through write_txn().
+    """
+    return _POOL.reader()
 
 
 # ---------------------------------------------------------
@@ -23,76 +51,333 @@ def get_conn():
 # ---------------------------------------------------------
 
 def init_db():
-    conn = get_conn()
-
-    # EVENTS
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS events (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        session_id TEXT,
-        turn_id INTEGER,
-        role TEXT,
-        content TEXT,
-        ts TEXT,
-        model TEXT
-    )
-    """)
-
-    # ALERTS
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS alerts (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        session_id TEXT,
-        severity TEXT,
-        score INTEGER,
-        labels TEXT,
-        confidence REAL,
-        created_at TEXT
-    )
-    """)
-
-    conn.commit()
-    conn.close()
+    with write_txn() as conn:
+
+        # EVENTS
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            turn_id INTEGER,
+            role TEXT,
+            content TEXT,
+            ts TEXT,
+            model TEXT
+        )
+        """)
+
+        # per-session reads in turn order and MAX(turn_id) seeks
+        conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_events_session_turn
+        ON events(session_id, turn_id)
+        """)
+
+        # SESSIONS: per-session summary kept up to date on insert,
+        # so the session list never aggregates the events table
+        has_sessions = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sessions'"
+        ).fetchone()
+
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            first_ts TEXT,
+            last_ts TEXT,
+            event_count INTEGER
+        )
+        """)
+
+        conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessions_last_ts
+        ON sessions(last_ts)
+        """)
+
+        if not has_sessions:
+            # databases from before the summary table
+            conn.execute("""
+            INSERT INTO sessions (session_id, first_ts, last_ts, event_count)
+            SELECT session_id, MIN(ts), MAX(ts), COUNT(*)
+            FROM events
+            GROUP BY session_id
+            """)
+
+        # ALERTS
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            severity TEXT,
+            score INTEGER,
+            labels TEXT,
+            confidence REAL,
+            created_at TEXT
+        )
+        """)
+
+        # refresh planner stats where they are stale
+        conn.execute("PRAGMA optimize")
 
 
 # ---------------------------------------------------------
 # EVENTS
 # ---------------------------------------------------------
 
-def get_session_events(session_id: str) -> List[Dict[str, Any]]:
+_INSERT_EVENT_SQL = """
+    INSERT INTO events
+    (session_id, turn_id, role, content, ts, model)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_UPSERT_SESSION_SQL = """
+    INSERT INTO sessions (session_id, first_ts, last_ts, event_count)
+    VALUES (?, ?, ?, 1)
+    ON CONFLICT(session_id) DO UPDATE SET
+        first_ts = MIN(first_ts, excluded.first_ts),
+        last_ts = MAX(last_ts, excluded.last_ts),
+        event_count = event_count + 1
+"""
+
+# the same keys _cache_rows() gives the events it caches
+_SESSION_EVENTS_SQL = """
+    SELECT id, session_id, turn_id, role, content, ts, model
+    FROM events
+    WHERE session_id = ?
+    ORDER BY turn_id ASC
+"""
+
+# Per-session event lists in turn order, so the write path rescores
+# from memory instead of re-reading the whole session after each
+# insert. LRU-bounded by session count; every event of a cached
+# session is kept because score_session looks at all of them.
+SESSION_CACHE_MAX = 1024
+
+_session_events: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+_session_lock = threading.Lock()
+
+_turn_key = itemgetter("turn_id")
+_id_key = itemgetter("id")
+
+
+def _cache_get(session_id: str) -> Optional[List[Dict[str, Any]]]:
+
+    events = _session_events.get(session_id)
+
+    if events is not None:
+        _session_events.move_to_end(session_id)
+
+    return events
+
+
+def _cache_put(session_id: str, events: List[Dict[str, Any]]):
+
+    _session_events[session_id] = events
+
+    if len(_session_events) > SESSION_CACHE_MAX:
+        _session_events.popitem(last=False)
+
+
+def _load_session(conn, session_id: str) -> List[Dict[str, Any]]:
+    return [dict(r) for r in conn.execute(_SESSION_EVENTS_SQL, (session_id,))]
+
+
+# (session_id, turn_id, role, content, ts, model)
+EventRow = Tuple[str, int, str, str, str, Optional[str]]
+
+
+def _insert_rows(conn, rows: List[EventRow]) -> List[int]:
+
+    ids = []
+
+    for row in rows:
+        ids.append(conn.execute(_INSERT_EVENT_SQL, row).lastrowid)
+        conn.execute(_UPSERT_SESSION_SQL, (row[0], row[4], row[4]))
+
+    return ids
+
+
+def _cache_rows(conn, rows: List[EventRow], ids: List[int]):
+    """
+    Add committed rows to the cache. Caller holds _session_lock and
+    the write lock, so no other commit lands between ours and this.
+    """
+
+    # sessions read back after COMMIT already hold this batch's rows
+    loaded = set()
+
+    for row, event_id in zip(rows, ids):
+
+        session_id, turn_id, role, content, ts, model = row
+
+        if session_id in loaded:
+            continue
+
+        events = _cache_get(session_id)
+
+        if events is None:
+            _cache_put(session_id, _load_session(conn, session_id))
+            loaded.add(session_id)
+        else:
+            insort(
+                events,
+                {
+                    "id": event_id,
+                    "session_id": session_id,
+                    "turn_id": turn_id,
+                    "role": role,
+                    "content": content,
+                    "ts": ts,
+                    "model": model,
+                },
+                key=_turn_key,
+            )
+
+
+def _commit_rows(rows: List[EventRow]):
+    """
+    Insert rows in one transaction, then update the cache. The cache
+    only changes once COMMIT has succeeded: a rolled-back row must
+    never be seen, as SQLite hands its id out again.
+    """
+
+    with _POOL.write_lock:
+
+        with write_txn() as conn:
+            ids = _insert_rows(conn, rows)
+
+        with _session_lock:
+            _cache_rows(conn, rows, ids)
+
+
+def insert_events(rows: List[EventRow]) -> None:
+    """
+    Store rows in one transaction (one commit for the batch).
+    """
+
+    _commit_rows(rows)
+
+
+def insert_event(
+    session_id: str,
+    turn_id: int,
+    role: str,
+    content: str,
+    ts: str,
+    model: Optional[str],
+) -> List[Dict[str, Any]]:
+    """
+    Store one event; returns the session's events in turn order.
+    The event dicts are shared with the cache: treat them as
+    read-only.
+    """
+
+    row = (session_id, turn_id, role, content, ts, model)
+
+    with _POOL.write_lock:
+
+        _commit_rows([row])
+
+        with _session_lock:
+            # copied under the lock: the cached list keeps growing
+            return list(_cache_get(session_id))
+
+
+_NEXT_TURN_SQL = """
+    SELECT COALESCE(MAX(turn_id), 0) + 1
+    FROM events
+    WHERE session_id = ?
+"""
+
+
+def next_turn_id(session_id: str) -> int:
+
     conn = get_conn()
 
-    rows = conn.execute(
-        """
-        SELECT *
-        FROM events
-        WHERE session_id = ?
-        ORDER BY turn_id ASC
-        """,
+    return conn.execute(_NEXT_TURN_SQL, (session_id,)).fetchone()[0]
+
+
+_SESSION_VERSION_SQL = """
+    SELECT COUNT(*), MAX(id)
+    FROM events
+    WHERE session_id = ?
+"""
+
+
+def session_version(session_id: str) -> Optional[Tuple[int, int]]:
+    """
+    (event count, max event id): changes whenever the session's
+    events do. Ids of committed rows are never reused (AUTOINCREMENT);
+    a rolled-back id is, but such rows never reach the cache. None if
+    no events.
+    """
+
+    with _session_lock:
+        events = _cache_get(session_id)
+        if events:
+            return len(events), max(map(_id_key, events))
+
+    count, max_id = get_conn().execute(
+        _SESSION_VERSION_SQL,
         (session_id,),
-    ).fetchall()
+    ).fetchone()
 
-    conn.close()
-    return [dict(r) for r in rows]
+    return (count, max_id) if count else None
+
+
+def get_session_events(session_id: str) -> List[Dict[str, Any]]:
+
+    with _session_lock:
+        events = _cache_get(session_id)
+
+    if events is None:
 
+        # load through the writer so no insert lands between the
+        # read and the cache fill
+        with _POOL.write_lock:
 
-def list_sessions(limit: int = 100):
+            with _session_lock:
+                events = _cache_get(session_id)
+
+            if events is None:
+                events = _load_session(_POOL.writer(), session_id)
+
+                # unknown sessions are not cached
+                if events:
+                    with _session_lock:
+                        _cache_put(session_id, events)
+
+    with _session_lock:
+        # callers (the timeline) may edit the dicts
+        return [dict(e) for e in events]
+
+
+# newest first straight off idx_sessions_last_ts; LIKE is
+# case-insensitive for ASCII
+_LIST_SESSIONS_SQL = """
+    SELECT
+        session_id,
+        event_count
+    FROM sessions
+    WHERE (? IS NULL OR session_id LIKE ? ESCAPE '\\')
+    ORDER BY last_ts DESC
+    LIMIT ?
+"""
+
+
+def _like_contains(q: str) -> str:
+    q = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{q}%"
+
+
+def list_sessions(limit: int = 100, q: Optional[str] = None):
     conn = get_conn()
 
+    pattern = _like_contains(q) if q else None
+
     rows = conn.execute(
-        """
-        SELECT
-            session_id,
-            COUNT(*) as event_count
-        FROM events
-        GROUP BY session_id
-        ORDER BY MAX(ts) DESC
-        LIMIT ?
-        """,
-        (limit,),
+        _LIST_SESSIONS_SQL,
+        (pattern, pattern, limit),
     ).fetchall()
 
-    conn.close()
     return [dict(r) for r in rows]
 
 
@@ -100,36 +385,6 @@ def list_sessions(limit: int = 100):
 # ALERTS
 # ---------------------------------------------------------
 
-def insert_alert(
-    session_id: str,
-    severity: str,
-    score: int,
-    labels: List[str],
-    confidence: float,
-    created_at: str,
-):
-    conn = get_conn()
-
-    conn.execute(
-        """
-        INSERT INTO alerts
-        (session_id, severity, score, labels, confidence, created_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            session_id,
-            severity,
-            score,
-            ",".join(labels),
-            confidence,
-            created_at,
-        ),
-    )
-
-    conn.commit()
-    conn.close()
-
-
 def list_alerts(limit: int = 100):
     conn = get_conn()
 
@@ -143,7 +398,6 @@ def list_alerts(limit: int = 100):
         (limit,),
     ).fetchall()
 
-    conn.close()
 
     alerts = []
     for r in rows:
@@ -167,7 +421,6 @@ def get_alerts_for_session(session_id: str):
         (session_id,),
     ).fetchall()
 
-    conn.close()
 
     alerts = []
     for r in rows:
@@ -197,8 +450,6 @@ def list_active_alerts(window_seconds: int = 3600):
         (cutoff.isoformat(),),
     ).fetchall()
 
-    conn.close()
-
     alerts = []
     for r in rows:
         d = dict(r)
@@ -213,8 +464,10 @@ def list_active_alerts(window_seconds: int = 3600):
 # ---------------------------------------------------------
 
 def dev_reset_all():
-    conn = get_conn()
-    conn.execute("DELETE FROM events")
-    conn.execute("DELETE FROM alerts")
-    conn.commit()
-    conn.close()
+    with write_txn() as conn:
+        conn.execute("DELETE FROM events")
+        conn.execute("DELETE FROM sessions")
+        conn.execute("DELETE FROM alerts")
+
+        with _session_lock:
+            _session_events.clear()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Union
+
+
+# sqlite3 keeps compiled statements per connection keyed by SQL
+# text; callers keep hot queries as module constants so every call
+# hits that cache instead of re-preparing.
+STATEMENT_CACHE_SIZE = 256
+
+
+class SQLitePool:
+    """
+    One shared writer (serialized by a lock) plus one reader per
+    live thread, opened lazily so SQLite's page cache survives
+    between calls. Threadpool workers come and go (AnyIO retires
+    idle ones), so readers of finished threads are closed whenever
+    a new reader opens: the count stays at the live thread count.
+
+    Connections run in autocommit mode; writes go through
+    write_txn(), which opens the transaction explicitly.
+    """
+
+    def __init__(self, path: Union[str, Path], pragmas: Sequence[str] = ()):
+
+        self.path = path
+        self.pragmas = tuple(pragmas)
+
+        self._writer: Optional[sqlite3.Connection] = None
+        # reentrant: callers may hold it across write_txn() to act
+        # after COMMIT before the next writer gets in
+        self.write_lock = threading.RLock()
+
+        self._local = threading.local()
+        self._readers: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._readers_lock = threading.Lock()
+
+        # bumped by close() so threads drop their stale reader
+        self._generation = 0
+
+    def _connect(self) -> sqlite3.Connection:
+
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+
+        conn.row_factory = sqlite3.Row
+
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+
+        return conn
+
+    def writer(self) -> sqlite3.Connection:
+        """
+        Shared writer connection.
+        Callers must hold write_lock while using it.
+        """
+
+        if self._writer is None:
+            self._writer = self._connect()
+
+        return self._writer
+
+    def reader(self) -> sqlite3.Connection:
+
+        local = self._local
+        conn = getattr(local, "conn", None)
+
+        if conn is None or local.generation != self._generation:
+
+            conn = self._connect()
+            local.conn = conn
+            local.generation = self._generation
+
+            with self._readers_lock:
+                self._close_dead_readers()
+                self._readers[threading.current_thread()] = conn
+
+        return conn
+
+    def _close_dead_readers(self):
+        """
+        Caller holds _readers_lock.
+        """
+
+        for thread in [t for t in self._readers if not t.is_alive()]:
+            self._readers.pop(thread).close()
+
+    @contextmanager
+    def write_txn(self) -> Iterator[sqlite3.Connection]:
+        """
+        Serialized write transaction on the shared writer.
+        BEGIN IMMEDIATE takes the write lock up front instead of
+        failing with SQLITE_BUSY halfway through.
+        """
+
+        with self.write_lock:
+
+            conn = self.writer()
+
+            conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                # also after a failed COMMIT (busy, disk full): the
+                # shared writer must not stay inside the transaction
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+
+        with self.write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+        with self._readers_lock:
+            for conn in self._readers.values():
+                conn.close()
+            self._readers.clear()
+            self._generation += 1
@@ -1,8 +1,11 @@
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse, JSONResponse
+import time
 
-from app.alerts.store import list_active_alerts
-from app.ui.layout import page_html
+import orjson
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, Response
+
+from app.alerts.store import alerts_version, list_active_alerts
+from app.ui.layout import StaticPage
 
 router = APIRouter()
 
@@ -11,10 +14,7 @@ router = APIRouter()
 # HTML PAGE
 # ---------------------------------------------------------
 
-@router.get("/ui/active", response_class=HTMLResponse)
-def ui_active():
-
-    body = """
+_ACTIVE_BODY = """
 <h2>Active Alerts (Live)</h2>
 
 <div class="card">
@@ -47,6 +47,18 @@ Loading Active Alerts...
 
 <script>
 
+// session ids come from clients: never insert them as markup
+function esc(v){
+
+    return String(v ?? "")
+        .replace(/&/g,"&amp;")
+        .replace(/</g,"&lt;")
+        .replace(/>/g,"&gt;")
+        .replace(/"/g,"&quot;")
+        .replace(/'/g,"&#x27;");
+}
+
+
 async function loadActive(){
 
     try{
@@ -80,14 +92,14 @@ async function loadActive(){
 <tr>
 
 <td>
-<code>${a.session_id}</code>
+<code>${esc(a.session_id)}</code>
 </td>
 
-<td>${a.severity}</td>
+<td>${esc(a.severity)}</td>
 
-<td>${a.score}</td>
+<td>${esc(a.score)}</td>
 
-<td>${a.confidence}</td>
+<td>${esc(a.confidence)}</td>
 
 </tr>
 `;
@@ -111,22 +123,49 @@ setInterval(loadActive,5000);
 </script>
 """
 
-    return page_html(
-        "Active Alerts",
-        body,
-        active="active",
-    )
+# rows are filled in client-side from /api/active: the page is static
+_ACTIVE_PAGE = StaticPage(
+    "Active Alerts",
+    _ACTIVE_BODY,
+    active="active",
+)
+
+
+@router.get("/ui/active", response_class=HTMLResponse)
+async def ui_active(request: Request):
+    return _ACTIVE_PAGE.response(request)
 
 
 # ---------------------------------------------------------
 # JSON API (AUTO REFRESH SOURCE)
 # ---------------------------------------------------------
 
+# Every open /ui/active page polls this every 5s. The encoded
+# feed is reused until it is ACTIVE_TTL_SECONDS old (alerts age out
+# of the window) or an alert is written.
+ACTIVE_TTL_SECONDS = 5.0
+
+# (alerts version, expires at (monotonic), encoded body)
+_active_cache = (-1, 0.0, b"")
+
+
 @router.get("/api/active")
 def api_active():
+    global _active_cache
+
+    version = alerts_version()
+    now = time.monotonic()
+
+    cached = _active_cache
+    if cached[0] == version and now < cached[1]:
+        return Response(cached[2], media_type="application/json")
 
     alerts = list_active_alerts(
         window_seconds=3600
     )
 
-    return JSONResponse(alerts)
+    body = orjson.dumps(alerts)
+
+    _active_cache = (version, now + ACTIVE_TTL_SECONDS, body)
+
+    return Response(body, media_type="application/json")
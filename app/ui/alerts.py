@@ -1,56 +1,20 @@
-from typing import List, Dict, Any
+from html import escape as esc
+from operator import itemgetter
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import HTMLResponse
 
-from app.alerts.store import list_alerts
-from app.ui.layout import page_html
+from app.alerts.store import iter_alerts, iter_session_alerts
+from app.ui.layout import page_html, stream_page
 
 
 router = APIRouter()
 
 
-def esc(s: str) -> str:
-    return (
-        (s or "")
-        .replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-    )
-
-
-@router.get("/ui/alerts", response_class=HTMLResponse)
-def alerts_page():
-
-    alerts: List[Dict[str, Any]] = list_alerts(limit=200)
-
-    rows = []
-
-    for a in alerts:
-
-        sid = a["session_id"]
-
-        rows.append(f"""
-<tr>
-
-<td><code>{esc(sid)}</code></td>
-
-<td>{esc(a.get("severity"))}</td>
-
-<td>{a.get("score")}</td>
-
-<td>{esc(", ".join(a.get("labels",[]) or []))}</td>
-
-<td>
-
-<a href="/ui/alerts/{esc(sid)}">View</a>
-
-</td>
-
-</tr>
-""")
-
-    body = f"""
+# ---------------------------------------------------------
+# TEMPLATES
+# ---------------------------------------------------------
+_ALERTS_PAGE = """
 <h2>Alerts</h2>
 
 <div class="card">
@@ -71,7 +35,7 @@ def alerts_page():
 
 <tbody>
 
-{''.join(rows) if rows else "<tr><td colspan=5>No Alerts</td></tr>"}
+{rows}
 
 </tbody>
 
@@ -80,66 +44,46 @@ def alerts_page():
 </div>
 """
 
-    return page_html(
-        "Alerts",
-        body,
-        active="alerts",
-    )
+_ALERT_ROW = """
+<tr>
 
+<td><code>%s</code></td>
 
-@router.get("/ui/alerts/{session_id}", response_class=HTMLResponse)
-def alerts_for_session(session_id: str):
+<td>%s</td>
 
-    alerts = [
-        a for a in list_alerts(500)
-        if a["session_id"] == session_id
-    ]
+<td>%s</td>
 
-    if not alerts:
+<td>%s</td>
 
-        body = f"""
-<h2>No Alerts</h2>
+<td>
 
-<div class="card">
+<a href="/ui/alerts/%s">View</a>
 
-No alerts exist for
-<code>{esc(session_id)}</code>
+</td>
 
-</div>
+</tr>
 """
 
-        return page_html(
-            "No Alerts",
-            body,
-            active="alerts",
-        )
-
-    rows = []
+_NO_ALERT_ROWS = "<tr><td colspan=5>No Alerts</td></tr>"
 
-    for a in alerts:
+# each stored alert carries one label, in alert_type
+_alert_fields = itemgetter("session_id", "severity", "score", "alert_type")
 
-        rows.append(f"""
-<tr>
+_ALERTS_HEAD, _ALERTS_TAIL = _ALERTS_PAGE.split("{rows}")
 
-<td>{a.get("created_at")}</td>
-
-<td>{a.get("severity")}</td>
-
-<td>{a.get("score")}</td>
+_NO_ALERTS_PAGE = """
+<h2>No Alerts</h2>
 
-<td>{esc(", ".join(a.get("labels",[])))}</td>
+<div class="card">
 
-<td>
-<a href="/ui/timeline/{esc(session_id)}">
-Timeline
-</a>
-</td>
+No alerts exist for
+<code>{session_id}</code>
 
-</tr>
-""")
+</div>
+"""
 
-    body = f"""
-<h2>Alerts : <code>{esc(session_id)}</code></h2>
+_SESSION_ALERTS_PAGE = """
+<h2>Alerts : <code>{session_id}</code></h2>
 
 <div class="card">
 
@@ -159,7 +103,7 @@ Timeline
 
 <tbody>
 
-{''.join(rows)}
+{rows}
 
 </tbody>
 
@@ -168,8 +112,91 @@ Timeline
 </div>
 """
 
-    return page_html(
+_SESSION_ALERT_ROW = """
+<tr>
+
+<td>%s</td>
+
+<td>%s</td>
+
+<td>%s</td>
+
+<td>%s</td>
+
+<td>
+<a href="/ui/timeline/%s">
+Timeline
+</a>
+</td>
+
+</tr>
+"""
+
+_session_alert_fields = itemgetter(
+    "created_at", "severity", "score", "alert_type"
+)
+
+_SESSION_ALERTS_HEAD, _SESSION_ALERTS_TAIL = _SESSION_ALERTS_PAGE.split("{rows}")
+
+# alerts are deduped per (session, label), so this is never reached
+# in practice; it only bounds a pathological session
+SESSION_ALERTS_MAX = 500
+
+
+@router.get("/ui/alerts", response_class=HTMLResponse)
+def alerts_page():
+
+    # loaded here in the threadpool; only rendering is streamed
+    alerts = list(iter_alerts(limit=200))
+
+    rows = []
+
+    for sid, severity, score, label in map(_alert_fields, alerts):
+        sid = esc(sid)
+        rows.append(
+            _ALERT_ROW
+            % (sid, esc(severity or ""), score, esc(label or ""), sid)
+        )
+
+    return stream_page(
+        "Alerts",
+        _ALERTS_HEAD,
+        rows,
+        _ALERTS_TAIL,
+        empty=_NO_ALERT_ROWS,
+        active="alerts",
+    )
+
+
+@router.get("/ui/alerts/{session_id}", response_class=HTMLResponse)
+def alerts_for_session(session_id: str):
+
+    # a range on idx_alerts_session, newest first
+    alerts = list(iter_session_alerts(session_id, SESSION_ALERTS_MAX))
+
+    if not alerts:
+
+        body = _NO_ALERTS_PAGE.format(session_id=esc(session_id))
+
+        return page_html(
+            "No Alerts",
+            body,
+            active="alerts",
+        )
+
+    sid = esc(session_id)
+
+    rows = [
+        _SESSION_ALERT_ROW
+        % (created_at, severity, score, esc(label or ""), sid)
+        for created_at, severity, score, label
+        in map(_session_alert_fields, alerts)
+    ]
+
+    return stream_page(
         "Alerts",
-        body,
+        _SESSION_ALERTS_HEAD.format(session_id=sid),
+        rows,
+        _SESSION_ALERTS_TAIL,
         active="alerts",
     )
@@ -1,3 +1,7 @@
+from collections import Counter
+from html import escape as esc
+from operator import itemgetter
+
 from fastapi import APIRouter
 from fastapi.responses import HTMLResponse
 
@@ -10,31 +14,7 @@ from app.ui.layout import page_html
 router = APIRouter()
 
 
-@router.get("/ui/dashboard", response_class=HTMLResponse)
-def dashboard():
-
-    sessions = list_sessions(limit=1000)
-
-    total_sessions=len(sessions)
-
-    active=list_active_alerts(3600)
-
-    active_count=len(active)
-
-    high=sum(1 for a in active if a["severity"]=="HIGH")
-    medium=sum(1 for a in active if a["severity"]=="MEDIUM")
-    low=sum(1 for a in active if a["severity"]=="LOW")
-    critical=sum(1 for a in active if a["severity"]=="CRITICAL")
-
-    rows="".join(f"""
-<tr>
-<td><code>{a["session_id"]}</code></td>
-<td>{a["severity"]}</td>
-<td>{round(a["confidence"]*100)}%</td>
-</tr>
-""" for a in active[:10])
-
-    body=f"""
+_DASHBOARD_PAGE = """
 <h2>Operator Dashboard</h2>
 
 <div class="card">
@@ -68,7 +48,7 @@ def dashboard():
 
 <tbody>
 
-{rows if rows else '<tr><td colspan=3>No Active Alerts</td></tr>'}
+{rows}
 
 </tbody>
 
@@ -77,6 +57,53 @@ def dashboard():
 </div>
 """
 
+_ACTIVE_ROW = """
+<tr>
+<td><code>%s</code></td>
+<td>%s</td>
+<td>%s%%</td>
+</tr>
+"""
+
+_severity = itemgetter("severity")
+_active_fields = itemgetter("session_id", "severity", "confidence")
+
+_NO_ACTIVE_ROWS = "<tr><td colspan=3>No Active Alerts</td></tr>"
+
+
+@router.get("/ui/dashboard", response_class=HTMLResponse)
+def dashboard():
+
+    sessions = list_sessions(limit=1000)
+
+    total_sessions=len(sessions)
+
+    active=list_active_alerts(3600)
+
+    active_count=len(active)
+
+    by_severity=Counter(map(_severity, active))
+
+    high=by_severity["HIGH"]
+    medium=by_severity["MEDIUM"]
+    low=by_severity["LOW"]
+    critical=by_severity["CRITICAL"]
+
+    rows="".join([
+        _ACTIVE_ROW % (esc(sid), esc(severity or ""), round(confidence*100))
+        for sid, severity, confidence in map(_active_fields, active[:10])
+    ])
+
+    body=_DASHBOARD_PAGE.format(
+        total_sessions=total_sessions,
+        active_count=active_count,
+        critical=critical,
+        high=high,
+        medium=medium,
+        low=low,
+        rows=rows or _NO_ACTIVE_ROWS,
+    )
+
     return page_html(
         "Dashboard",
         body,
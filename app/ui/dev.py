@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import RedirectResponse
+
+from app.storage.db import dev_reset_all
+
+
+router = APIRouter()
+
+
+# ---------------------------------------------------------
+# DEV RESET (Toast Enabled)
+# ---------------------------------------------------------
+
+@router.post("/ui/dev/reset")
+def ui_dev_reset():
+    dev_reset_all()
+    return RedirectResponse(
+        "/ui/dashboard?msg=System+Reset+Complete",
+        status_code=303,
+    )
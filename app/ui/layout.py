@@ -1,4 +1,8 @@
-from typing import Optional
+import gzip
+from typing import AsyncIterator, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, StreamingResponse
 
 
 def nav(active):
@@ -16,13 +20,9 @@ def nav(active):
 """
 
 
-def page_html(
-    title: str,
-    body: str,
-    active: Optional[str] = None,
-):
-
-    return f"""
+# Page shell, formatted once per request; the nav for each
+# section is rendered once at import.
+_PAGE = """
 <html>
 <head>
 <title>{title}</title>
@@ -84,7 +84,7 @@ td, th {{
 
 <body>
 
-{nav(active)}
+{nav}
 
 <div>
 {body}
@@ -108,3 +108,123 @@ function toast(msg) {{
 </body>
 </html>
 """
+
+_NAV = {
+    name: nav(name)
+    for name in ("dashboard", "active", "alerts", "sessions", "home", None)
+}
+
+
+def page_html(
+    title: str,
+    body: str,
+    active: Optional[str] = None,
+):
+
+    return _PAGE.format(
+        title=title,
+        nav=_NAV.get(active) or nav(active),
+        body=body,
+    )
+
+
+# ---------------------------------------------------------
+# STATIC PAGES
+# ---------------------------------------------------------
+
+# caches must key on Accept-Encoding: one URL, two bodies
+_PLAIN_HEADERS = {"vary": "Accept-Encoding"}
+_GZIP_HEADERS = {"vary": "Accept-Encoding", "content-encoding": "gzip"}
+
+
+class StaticPage:
+    """
+    A page that never changes, encoded and gzip-compressed once at
+    import and sent as-is to every request.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        body: str,
+        active: Optional[str] = None,
+    ):
+
+        self.raw = page_html(title, body, active).encode("utf-8")
+
+        # mtime=0: identical bytes on every start
+        self.gz = gzip.compress(self.raw, compresslevel=9, mtime=0)
+
+    def response(self, request: Request) -> HTMLResponse:
+
+        # same test as Starlette's GZipMiddleware
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return HTMLResponse(self.gz, headers=_GZIP_HEADERS)
+
+        return HTMLResponse(self.raw, headers=_PLAIN_HEADERS)
+
+
+# ---------------------------------------------------------
+# STREAMED PAGES
+# ---------------------------------------------------------
+
+# page shell split around the body; the tail has no fields
+_PAGE_HEAD, _PAGE_TAIL = _PAGE.split("{body}")
+_PAGE_TAIL = _PAGE_TAIL.format()
+
+# table rows sent per chunk: one send per row costs more than
+# the string it carries
+ROWS_PER_CHUNK = 64
+
+
+def page_parts(
+    title: str,
+    active: Optional[str] = None,
+) -> Tuple[str, str]:
+    """
+    page_html() before and after the body.
+    """
+
+    head = _PAGE_HEAD.format(
+        title=title,
+        nav=_NAV.get(active) or nav(active),
+    )
+
+    return head, _PAGE_TAIL
+
+
+def stream_page(
+    title: str,
+    body_head: str,
+    rows: Iterable[str],
+    body_tail: str,
+    empty: str = "",
+    active: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Page whose body is body_head + rows + body_tail, sent as the rows
+    render. rows must not block: load the data before calling.
+    """
+
+    head, tail = page_parts(title, active)
+
+    async def chunks() -> AsyncIterator[str]:
+
+        yield head + body_head
+
+        batch = []
+        sent = False
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= ROWS_PER_CHUNK:
+                yield "".join(batch)
+                batch.clear()
+                sent = True
+
+        if batch or not sent:
+            yield "".join(batch) or empty
+
+        yield body_tail + tail
+
+    return StreamingResponse(chunks(), media_type="text/html")
@@ -2,6 +2,9 @@ import re
 
 MAX_SESSION_ID = 64
 
+_SPACE_RE = re.compile(r"\s+")
+_ILLEGAL_RE = re.compile(r"[^a-z0-9_\-]")
+
 
 def normalize_session_id(session_id: str) -> str:
     """
@@ -20,10 +23,10 @@ def normalize_session_id(session_id: str) -> str:
     sid = session_id.strip().lower()
 
     # spaces -> underscore
-    sid = re.sub(r"\s+", "_", sid)
+    sid = _SPACE_RE.sub("_", sid)
 
     # allow only safe chars
-    sid = re.sub(r"[^a-z0-9_\-]", "", sid)
+    sid = _ILLEGAL_RE.sub("", sid)
 
     # enforce max length
     sid = sid[:MAX_SESSION_ID]
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from fastapi import HTTPException
+
+from app.main import _next_cursor, _parse_cursor
+from app.alerts import store
+
+
+def _walk(fetch, limit):
+    """
+    Follow next_cursor until the last page; returns every id seen.
+    """
+
+    seen = []
+    before = None
+
+    while True:
+        rows = fetch(limit, _parse_cursor(before))
+        seen.extend(r["id"] for r in rows)
+        before = _next_cursor(rows, limit)
+        if before is None:
+            return seen
+
+
+class AlertPagesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+        # the pool opens data/llm_ids.db relative to the working directory
+        os.mkdir("data")
+        store.close_all()
+        store.init_db()
+
+        store.insert_alerts_bulk(
+            [("s1", "2026-01-01T00:00:00Z", "X", "HIGH", 80, 0.9, {})] * 5
+            + [("s1", "2026-01-02T00:00:00Z", "X", "HIGH", 80, 0.9, {})]
+            + [("s2", "2026-01-01T00:00:00Z", "Y", "LOW", 10, 0.1, {})]
+        )
+
+    def tearDown(self):
+        store.close_all()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _plan(self, sql, *params):
+        rows = store._conn_read().execute(
+            "EXPLAIN QUERY PLAN " + sql, params
+        ).fetchall()
+        return " ".join(r[3] for r in rows)
+
+    def test_tied_timestamps_are_all_reached(self):
+        ids = _walk(lambda limit, before: store.list_alerts(limit, before), 2)
+
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+
+    def test_session_pages_with_ties(self):
+        ids = _walk(
+            lambda limit, before: store.list_session_alerts("s1", limit, before),
+            2,
+        )
+
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(len(set(ids)), 6)
+
+    def test_newest_first(self):
+        rows = store.list_alerts(3)
+
+        self.assertEqual(rows[0]["created_at"], "2026-01-02T00:00:00Z")
+        self.assertGreater(rows[1]["id"], rows[2]["id"])
+
+    def test_cursor_page_is_an_index_range(self):
+        plan = self._plan(
+            store._LIST_ALERTS_BEFORE_SQL, "2026-01-02T00:00:00Z", 9, 2
+        )
+
+        self.assertIn("created_at<?", plan)
+
+    def test_session_pages_need_no_sort(self):
+        plan = self._plan(
+            store._SESSION_ALERTS_BEFORE_SQL, "s1", "2026-01-02T00:00:00Z", 9, 2
+        )
+
+        self.assertIn("idx_alerts_session (session_id=? AND created_at<?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_old_descending_session_index_is_rebuilt(self):
+        with store._write_txn() as conn:
+            conn.execute("DROP INDEX idx_alerts_session")
+            conn.execute(
+                "CREATE INDEX idx_alerts_session"
+                " ON alerts(session_id, created_at DESC)"
+            )
+
+        store.init_db()
+
+        plan = self._plan(store._SESSION_ALERTS_SQL, "s1", 2)
+
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(_parse_cursor("2026-01-01|a|7"), ("2026-01-01|a", 7))
+        self.assertIsNone(_parse_cursor(None))
+
+        with self.assertRaises(HTTPException):
+            _parse_cursor("no-id")
+
+
+if __name__ == "__main__":
+    unittest.main()
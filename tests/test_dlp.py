@@ -0,0 +1,66 @@
+import unittest
+
+from app.gateway.dlp import find_pii, redact_pii
+
+
+def _types(hits):
+    return [h["type"] for h in hits]
+
+
+class OverlappingKindsTest(unittest.TestCase):
+    """
+    Each kind is scanned on its own, so a match of one kind does not
+    hide an overlapping match of another.
+    """
+
+    def test_ssn_inside_email_reports_both(self):
+        text, hits = redact_pii("123-45-6789@x.com")
+
+        self.assertEqual(text, "[REDACTED_SSN]@x.com")
+        self.assertEqual(_types(hits), ["SSN", "EMAIL"])
+        self.assertEqual(_types(find_pii("123-45-6789@x.com")), ["SSN", "EMAIL"])
+
+    def test_ssn_after_digits_is_redacted_as_ssn(self):
+        text, hits = redact_pii("acct 5551 123-45-6789")
+
+        self.assertEqual(text, "acct 5551 [REDACTED_SSN]")
+        self.assertIn("SSN", _types(hits))
+
+    def test_separate_kinds(self):
+        text, hits = redact_pii("mail a@b.com card 4111-1111-1111-1111")
+
+        self.assertEqual(text, "mail [REDACTED_EMAIL] card [REDACTED_NUMBER]")
+        self.assertEqual(_types(hits), ["EMAIL", "CREDIT_CARD_LIKE"])
+
+    def test_no_pii(self):
+        self.assertEqual(redact_pii("nothing here"), ("nothing here", []))
+        self.assertEqual(redact_pii(None), ("", []))
+
+
+class LuhnRejectedSpanTest(unittest.TestCase):
+    """
+    A card-shaped digit run that fails Luhn must not shield an SSN
+    it runs into.
+    """
+
+    def test_ssn_next_to_luhn_failing_number(self):
+        text, hits = redact_pii("ref 0000 1111 2222 123-45-6789 ok")
+
+        self.assertEqual(text, "ref 0000 1111 2222 [REDACTED_SSN] ok")
+        self.assertEqual(_types(hits), ["SSN"])
+
+    def test_card_next_to_ssn_is_redacted_and_reported(self):
+        text, hits = redact_pii("card 4111 1111 1111 1111 123-45-6789")
+
+        self.assertEqual(text, "card [REDACTED_NUMBER] [REDACTED_SSN]")
+        self.assertEqual(_types(hits), ["SSN", "CREDIT_CARD_LIKE"])
+
+    def test_luhn_failing_number_alone_is_kept(self):
+        self.assertEqual(
+            redact_pii("order 1234 5678 9012 3456"),
+            ("order 1234 5678 9012 3456", []),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
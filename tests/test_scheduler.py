@@ -0,0 +1,30 @@
+import asyncio
+import unittest
+
+from app.scoring.scheduler import ScoringScheduler
+
+
+def _fail(session_id):
+    raise RuntimeError(f"boom {session_id}")
+
+
+class SchedulerFailureTest(unittest.TestCase):
+
+    def test_failed_run_is_logged(self):
+
+        async def run():
+            sched = ScoringScheduler(_fail, delay=0)
+            sched.schedule("s1")
+            await sched.stop()
+            # done callbacks run on the next loop turn
+            await asyncio.sleep(0)
+
+        with self.assertLogs("app.scoring.scheduler", "ERROR") as logs:
+            asyncio.run(run())
+
+        self.assertIn("'s1'", logs.output[0])
+        self.assertIn("boom s1", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
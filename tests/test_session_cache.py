@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app.storage import db
+
+
+def _row(turn_id, content="hi"):
+    return ("s1", turn_id, "user", content, "2026-01-01T00:00:00Z", None)
+
+
+class SessionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+        # the pool opens llm_ids.db relative to the working directory
+        db.close_all()
+        db._session_events.clear()
+        db.init_db()
+
+        with db.write_txn() as conn:
+            conn.execute(
+                "CREATE TEMP TRIGGER fail_boom BEFORE INSERT ON events"
+                " WHEN NEW.content = 'boom'"
+                " BEGIN SELECT RAISE(ABORT, 'boom'); END"
+            )
+
+    def tearDown(self):
+        db.close_all()
+        db._session_events.clear()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _stored_ids(self):
+        rows = db.get_conn().execute(
+            "SELECT id FROM events WHERE session_id = 's1' ORDER BY turn_id"
+        )
+        return [r[0] for r in rows]
+
+    def test_rolled_back_rows_never_reach_the_cache(self):
+        db.insert_event(*_row(1))
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            db.insert_events([_row(2), _row(3, "boom")])
+
+        self.assertEqual(
+            [e["turn_id"] for e in db.get_session_events("s1")], [1]
+        )
+
+        # the rolled-back id is handed out again
+        events = db.insert_event(*_row(2))
+
+        self.assertEqual([e["id"] for e in events], self._stored_ids())
+        self.assertEqual(db.session_version("s1"), (2, self._stored_ids()[-1]))
+
+    def test_cache_is_untouched_until_commit(self):
+        db.insert_event(*_row(1))
+
+        seen = []
+
+        def snapshot():
+            # what another thread would read mid-transaction
+            events = db._session_events.get("s1") or []
+            seen.append([e["turn_id"] for e in events])
+
+        with db.write_txn() as conn:
+            conn.create_function("snapshot", 0, snapshot)
+            conn.execute(
+                "CREATE TEMP TRIGGER watch AFTER INSERT ON events"
+                " BEGIN SELECT snapshot(); END"
+            )
+
+        db.insert_events([_row(2), _row(3)])
+
+        self.assertEqual(seen, [[1], [1]])
+        self.assertEqual(
+            [e["turn_id"] for e in db.get_session_events("s1")], [1, 2, 3]
+        )
+
+    def test_batch_fills_an_uncached_session_once(self):
+        db.insert_events([_row(1), _row(2), _row(3)])
+
+        self.assertEqual(
+            [e["id"] for e in db.get_session_events("s1")],
+            self._stored_ids(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
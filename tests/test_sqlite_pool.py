@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from app.storage.sqlite import SQLitePool
+
+
+class WriteTxnTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.pool = SQLitePool(
+            os.path.join(self._tmp.name, "t.db"),
+            ("PRAGMA foreign_keys=ON",),
+        )
+
+        with self.pool.write_txn() as conn:
+            conn.execute("CREATE TABLE p (id INTEGER PRIMARY KEY)")
+            # deferred: the violation is only reported by COMMIT
+            conn.execute(
+                "CREATE TABLE c (pid INTEGER REFERENCES p(id)"
+                " DEFERRABLE INITIALLY DEFERRED)"
+            )
+
+    def tearDown(self):
+        self.pool.close()
+        self._tmp.cleanup()
+
+    def test_failed_commit_rolls_back(self):
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.pool.write_txn() as conn:
+                conn.execute("INSERT INTO c VALUES (1)")
+
+        self.assertFalse(self.pool.writer().in_transaction)
+
+        # the writer is usable again
+        with self.pool.write_txn() as conn:
+            conn.execute("INSERT INTO p VALUES (1)")
+            conn.execute("INSERT INTO c VALUES (1)")
+
+        count = self.pool.reader().execute("SELECT COUNT(*) FROM c").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_failed_statement_rolls_back(self):
+
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.pool.write_txn() as conn:
+                conn.execute("INSERT INTO p VALUES (2)")
+                conn.execute("INSERT INTO missing VALUES (1)")
+
+        self.assertFalse(self.pool.writer().in_transaction)
+
+        count = self.pool.reader().execute("SELECT COUNT(*) FROM p").fetchone()[0]
+        self.assertEqual(count, 0)
+
+
+class ReaderLifetimeTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.pool = SQLitePool(os.path.join(self._tmp.name, "t.db"))
+
+    def tearDown(self):
+        self.pool.close()
+        self._tmp.cleanup()
+
+    def _read_in_threads(self, n):
+
+        conns = []
+
+        def read():
+            conn = self.pool.reader()
+            conn.execute("SELECT 1").fetchone()
+            conns.append(conn)
+
+        threads = [threading.Thread(target=read) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        return conns
+
+    def test_readers_of_finished_threads_are_closed(self):
+
+        first = self._read_in_threads(5)
+        self._read_in_threads(5)
+
+        # each wave of threads has exited; only the last opener's
+        # sweep has run, so at most one wave is still registered
+        self.assertLessEqual(len(self.pool._readers), 5)
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            first[0].execute("SELECT 1")
+
+        self.pool.reader()
+        self.assertEqual(len(self.pool._readers), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()